@@ -8,10 +8,12 @@ def main(args=None):
     Command line syntax:
 
     `python fetch_html.py <url> [file_name] [config] [wait_for_selector]
-    [wait_for_selector_timeout]`
+    [wait_for_selector_timeout] [root_selectors]`
 
     - `<>` are required arguments
     - `[]` are optional arguments
+    - `root_selectors` is a comma separated list of css selectors of the
+      elements to keep, e.g. `article,.comments`
     """
     try:
         # initialize scraper
@@ -28,12 +30,16 @@ def main(args=None):
         if wait_for_selector != "":
             wait_for_selector_timeout = args[4] if len(args) >= 5 else input(
                 "Enter wait timeout when fetching html (default: 0): ")
-        scraper = BaseScraper(url, file_name, config,
-                              wait_for_selector, wait_for_selector_timeout)
-
-        # run scraper
-        scraper.fetch_html()
-        scraper.save_html()
+        root_selectors = args[5] if len(args) >= 6 else input(
+            "Enter comma separated css selectors of elements to keep (default: whole page): ")
+        root_selectors = [selector.strip() for selector in
+                          root_selectors.split(",") if selector.strip()]
+        with BaseScraper(url, file_name, config,
+                         wait_for_selector, wait_for_selector_timeout,
+                         root_selectors=root_selectors) as scraper:
+            # run scraper
+            scraper.fetch_html()
+            scraper.save_html()
     except KeyboardInterrupt:
         print("\nExiting...")
 
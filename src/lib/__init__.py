@@ -1,3 +1,4 @@
 from lib.base_scraper import BaseScraper
 from lib.medium_article_scraper import MediumArticleScraper
 from lib.medium_trending_links_scraper import MediumTrendingLinksScraper
+from lib.scraper_service import ScraperService
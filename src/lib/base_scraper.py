@@ -1,11 +1,38 @@
 from __future__ import annotations
 import os
 import requests
+from bs4 import BeautifulSoup
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from lib.utilities import Config, construct_file_name_from_url
+from lib.utilities import Config, construct_file_name_from_url, create_driver
+
+
+# Return the outerHTML of the root elements matching `arguments[0]` (or the
+# whole document when empty), without the elements matching `arguments[1]`.
+# Roots nested in another matched root are skipped to avoid duplicates. The
+# doctype is kept for the whole document so that it is not rendered in quirks mode.
+EXTRACT_HTML_SCRIPT = """
+const [rootSelectors, stripTags] = arguments;
+let roots = [document.documentElement];
+let doctype = "";
+if (!rootSelectors.length && document.doctype) {
+    doctype = new XMLSerializer().serializeToString(document.doctype) + "\\n";
+}
+if (rootSelectors.length) {
+    roots = Array.from(document.querySelectorAll(rootSelectors.join(",")));
+    roots = roots.filter(el => !roots.some(other => other !== el && other.contains(el)));
+}
+return doctype + roots.map(el => {
+    if (!stripTags.length) {
+        return el.outerHTML;
+    }
+    const clone = el.cloneNode(true);
+    clone.querySelectorAll(stripTags.join(",")).forEach(node => node.remove());
+    return clone.outerHTML;
+}).join("\\n");
+"""
 
 
 class BaseScraper:
@@ -20,37 +47,75 @@ class BaseScraper:
     - `wait_for_selector_timeout`: the timeout in seconds to wait for the element
     - `html`: the html content (available after calling `fetch_html`)
     - `output_file_path`: the file path to save the html
-    - `driver`: the Selenium driver
+    - `driver`: the Selenium driver (pass a running driver to share it, a
+                shared driver is not quit by the scraper), started only when
+                the `driver_path` config key is set or `requires_driver` is
+                `True`, otherwise `None` and html is fetched with `requests`
+    - `root_selectors`: the css selectors of the elements to keep when fetching
+                        html (default: the whole page)
+    - `strip_tags`: the tags to remove when fetching html, in-page with
+                    Selenium, e.g. `["script", "style"]` (default: none)
+    - `release_after_save`: release the html after saving it (default: `False`)
     - `display_url`: the url to display in non-verbose mode
     - `display_output_file_path`: the file path to display in non-verbose mode
 
     Methods:
     - `fetch_html()`: fetch the html from the `url` attribute and return the html
     - `save_html()`: save the html to `{config["output_dir_path"]}/{output_file_name}`
+    - `release_html()`: drop the html to free its memory
+    - `close()`: quit the Selenium driver unless it is shared
+
+    Use the scraper as a context manager to close it when done, e.g.:
+
+    `with BaseScraper(url) as scraper: ...`
     """
 
-    def __init__(self, url: str, output_file_name: str = "", config: str | Config = "", wait_for_selector: str | None = None, wait_for_selector_timeout: int = 0) -> None:
+    # whether the scraper needs a Selenium driver even without `driver_path`
+    requires_driver = False
+
+    def __init__(self, url: str, output_file_name: str = "", config: str | Config = "", wait_for_selector: str | None = None, wait_for_selector_timeout: int = 0, driver: webdriver.Firefox | None = None, root_selectors: list[str] | None = None, strip_tags: list[str] | None = None, release_after_save: bool = False) -> None:
+        # set first so that `close` works even if the initialization fails
+        self.driver = None
+        self._owns_driver = False
         self._init_url_attribute(url)
         self.output_file_name = output_file_name or construct_file_name_from_url(
             url)
         self.wait_for_selector = wait_for_selector
         self.wait_for_selector_timeout = wait_for_selector_timeout or 0
+        self.root_selectors = root_selectors or []
+        self.strip_tags = strip_tags or []
+        self.release_after_save = release_after_save
         self.html = ""
         self._init_config_attribute(config)
         self._init_output_file_path_attribute()
-        self._init_driver_attribute()
+        self._init_driver_attribute(driver)
         self._init_display_attributes()
 
     def __repr__(self) -> str:
         return f"<{self.__class__.__name__} url={self.url} output_file_name={self.output_file_name}>"
 
+    def __enter__(self) -> BaseScraper:
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
     def __del__(self):
         """
         The destructor method.
 
-        - Close the Selenium driver
+        - Close the Selenium driver unless it is shared
         """
-        self.driver.quit()
+        self.close()
+
+    def close(self) -> None:
+        """
+        Quit the Selenium driver unless it is shared and unset the `driver`
+        attribute. Safe to call more than once.
+        """
+        if self.driver is not None and self._owns_driver:
+            self.driver.quit()
+        self.driver = None
 
     def _init_url_attribute(self, url: str) -> None:
         """ Initialize the `url` attribute. """
@@ -73,19 +138,16 @@ class BaseScraper:
             self.output_file_name.removesuffix(".html") + ".html"
         )
 
-    def _init_driver_attribute(self) -> None:
-        """ Initialize the Selenium driver and set the `driver`. """
-        option = webdriver.FirefoxOptions()
-        # I use the following options as my machine is a window subsystem linux.
-        # I recommend to use the headless option at least, out of the 3
-        option.add_argument('--headless')
-        option.add_argument('--no-sandbox')
-        option.add_argument('--disable-dev-sh-usage')
-        # replace \\ with / in path if in windows
-        if os.name == "nt":
-            driver_path = self.config.data["driver_path"].replace("\\", "/")
-        self.driver = webdriver.Firefox(
-            executable_path=driver_path, options=option)
+    def _init_driver_attribute(self, driver: webdriver.Firefox | None = None) -> None:
+        """
+        Set the `driver` to the given shared driver, or initialize a new
+        Selenium driver owned by this scraper when Selenium is used.
+        """
+        if driver is not None:
+            self.driver = driver
+        elif self.requires_driver or self.config.data["driver_path"]:
+            self._owns_driver = True
+            self.driver = create_driver(self.config)
 
     def _init_display_attributes(self) -> None:
         """ Initialize attributes for display purposes. """
@@ -100,13 +162,13 @@ class BaseScraper:
     def fetch_html(self) -> str:
         """
         Scrape the html from the given url and return the response. Use Selenium
-        to fetch html dynamically when the `driver_path` config key is set.
+        to fetch html dynamically when the scraper has a `driver`.
         """
         if self.url == "" or self.url is None:
             raise ValueError("url is empty")
 
         print(f"Fetching html from {self.display_url}")
-        if self.config.data["driver_path"]:
+        if self.driver is not None:
             self.html = self._fetch_html_with_selenium()
         else:
             self.html = self._fetch_html_with_requests()
@@ -116,9 +178,31 @@ class BaseScraper:
     def _fetch_html_with_requests(self) -> str:
         """
         Scrape the html from the given url with Python `requests` module
-        and return the response.
+        and return the response, keeping only the `root_selectors` elements
+        without the `strip_tags` elements when either is set.
+        """
+        html = requests.get(self.url).content.decode("utf-8")
+        if not self.root_selectors and not self.strip_tags:
+            return html
+        return self._extract_html(html)
+
+    def _extract_html(self, html: str) -> str:
         """
-        return requests.get(self.url).content.decode("utf-8")
+        Return the `root_selectors` elements of the given html without the
+        `strip_tags` elements, like `EXTRACT_HTML_SCRIPT` does in-page.
+        """
+        soup = BeautifulSoup(html, 'html.parser')
+        roots = [soup]
+        if self.root_selectors:
+            roots = soup.select(",".join(self.root_selectors))
+            root_ids = {id(root) for root in roots}
+            roots = [root for root in roots
+                     if not any(id(parent) in root_ids for parent in root.parents)]
+        if self.strip_tags:
+            for root in roots:
+                for element in root.select(",".join(self.strip_tags)):
+                    element.decompose()
+        return "\n".join(str(root) for root in roots)
 
     def _fetch_html_with_selenium(self) -> str:
         """
@@ -129,7 +213,18 @@ class BaseScraper:
         if self.wait_for_selector:
             WebDriverWait(self.driver, self.wait_for_selector_timeout).until(
                 EC.visibility_of_element_located((By.CSS_SELECTOR, self.wait_for_selector)))
-        return self.driver.page_source
+        return self._get_page_html()
+
+    def _get_page_html(self) -> str:
+        """
+        Return the html of the page loaded in the Selenium driver. Transfer
+        only the `root_selectors` elements without the `strip_tags` elements
+        in one round trip when either is set, otherwise the whole page source.
+        """
+        if not self.root_selectors and not self.strip_tags:
+            return self.driver.page_source
+        return self.driver.execute_script(
+            EXTRACT_HTML_SCRIPT, self.root_selectors, self.strip_tags)
 
     def load_html(self, file_path: str) -> str:
         """
@@ -147,15 +242,19 @@ class BaseScraper:
         print("Done")
         return self.html
 
-    def save_html(self) -> None:
+    def save_html(self, overwrite: bool | None = None) -> None:
         """
         Save the `html` attribute to the file using `output_file_path` attribute.
-        Raise `FileExistsError` if the file already exists and user chooses
-        to not overwrite the file.
+        Ask the user whether to overwrite an existing file unless `overwrite`
+        is given. Raise `FileExistsError` if the file already exists and is not
+        overwritten.
         """
         print(f"Saving html to {self.display_output_file_path}")
         if os.path.exists(self.output_file_path):
-            if input(f"{self.output_file_path} already exists. Overwrite? (y/n)") == "y":
+            if overwrite is None:
+                overwrite = input(
+                    f"{self.output_file_path} already exists. Overwrite? (y/n)") == "y"
+            if overwrite:
                 os.remove(self.output_file_path)
             else:
                 raise FileExistsError(
@@ -163,3 +262,12 @@ class BaseScraper:
         with open(self.output_file_path, 'w', encoding="utf-8", newline="\n") as f:
             f.write(self.html)
         print("Done")
+        if self.release_after_save:
+            self.release_html()
+
+    def release_html(self) -> None:
+        """
+        Drop the `html` attribute so that its memory can be freed, e.g. after
+        saving it in a long batch run.
+        """
+        self.html = ""
@@ -2,13 +2,20 @@ from __future__ import annotations
 import re
 import time
 from bs4 import BeautifulSoup
+from selenium import webdriver
 from lib import BaseScraper
 from lib.utilities import Config
 
 
 class MediumArticleScraper(BaseScraper):
-    def __init__(self, url: str, file_name: str = "", config: str | Config = "") -> None:
-        super().__init__(url, file_name, config, None, 0)
+    # the article is rendered dynamically, so it is always fetched with Selenium
+    requires_driver = True
+
+    def __init__(self, url: str, file_name: str = "", config: str | Config = "", driver: webdriver.Firefox | None = None, release_after_save: bool = False) -> None:
+        # scripts are removed in-page as they are dropped when scraping anyway
+        super().__init__(url, file_name, config, None, 0, driver,
+                         strip_tags=["script"],
+                         release_after_save=release_after_save)
 
     def fetch_html(self) -> str:
         """
@@ -26,7 +33,7 @@ class MediumArticleScraper(BaseScraper):
         self.driver.execute_script(
             "window.scrollTo(0, document.body.scrollHeight);")
         time.sleep(2)
-        self.html = self.driver.page_source
+        self.html = self._get_page_html()
         print("Done")
         return self.html
 
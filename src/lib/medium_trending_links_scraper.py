@@ -3,13 +3,18 @@ import os
 import re
 from typing import List
 from bs4 import BeautifulSoup
+from selenium import webdriver
 from lib import BaseScraper
 from lib.utilities import Config
 
 
 class MediumTrendingLinksScraper(BaseScraper):
-    def __init__(self, url: str, file_name: str = "", config: str | Config = "") -> None:
-        super().__init__(url, file_name, config, None, 0)
+    def __init__(self, url: str, file_name: str = "", config: str | Config = "", driver: webdriver.Firefox | None = None, release_after_save: bool = False) -> None:
+        # only the trending posts are needed to scrape the links
+        super().__init__(url, file_name, config, None, 0, driver,
+                         root_selectors=[".pw-trending-post"],
+                         strip_tags=["script", "style", "svg", "img"],
+                         release_after_save=release_after_save)
         self.trending_links = []
 
     def scrape_trending_links(self) -> List[str]:
@@ -43,7 +48,7 @@ class MediumTrendingLinksScraper(BaseScraper):
         """
         Save the trending article links to a file. It is recommended to use the
         `scrape_trending_links` method and check the `trending_links` attribute
-        before saving the links.
+        before saving the links. Release the html when `release_after_save` is set.
         """
         if len(self.trending_links) == 0:
             print("No trending links to save")
@@ -58,3 +63,5 @@ class MediumTrendingLinksScraper(BaseScraper):
             for link in self.trending_links:
                 f.write(f"{link}\n")
         print("Done")
+        if self.release_after_save:
+            self.release_html()
@@ -0,0 +1,520 @@
+from __future__ import annotations
+import json
+import os
+import queue
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from selenium import webdriver
+from selenium.common.exceptions import InvalidSessionIdException, NoSuchWindowException, WebDriverException
+from lib import BaseScraper, MediumArticleScraper, MediumTrendingLinksScraper
+from lib.utilities import Config, construct_file_name_from_url, create_driver, format_memory_usage, get_driver_memory_usage, get_memory_usage
+
+
+class ScraperJob:
+    """
+    A job submitted to the `ScraperService`.
+
+    Attributes:
+    - `id`: the unique job id
+    - `type`: the job type (`fetch`, `scrape-article` or `scrape-trending`)
+    - `params`: the job parameters as submitted (`url`, `file_name`,
+                `wait_for_selector`, `wait_for_selector_timeout`,
+                `root_selectors`, `strip_tags`, depending on the job type), the
+                output file name is built from `file_name` suffixed with the
+                job id to keep outputs unique
+    - `status`: the job status (`queued`, `running`, `done` or `failed`)
+    - `result`: the job result (available when the job is done)
+    - `error`: the error message (available when the job failed)
+    - `created_at`, `started_at`, `finished_at`: the job timestamps
+    """
+
+    def __init__(self, type: str, params: dict) -> None:
+        self.id = uuid.uuid4().hex
+        self.type = type
+        self.params = params
+        self.status = "queued"
+        self.result = None
+        self.error = None
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__} id={self.id} type={self.type} status={self.status}>"
+
+    def to_dict(self) -> dict:
+        """ Return the job as a JSON serializable dict. """
+        return {
+            "id": self.id,
+            "type": self.type,
+            "params": self.params,
+            "status": self.status,
+            "result": self.result,
+            "error": self.error,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
+
+
+class ScraperService:
+    """
+    A long-running scraper service keeping the config and Selenium drivers
+    warm between jobs. Jobs are accepted over a local HTTP API into a bounded
+    queue and run by worker threads, each owning one driver. A driver is
+    started when a worker first runs a job fetching with Selenium, and
+    replaced when its session breaks.
+
+    Memory usage is reported after every job. The `memory_budget_mb` config
+    key bounds the total memory of the service process and its drivers. When
+    it is exceeded, the workers quit their drivers as soon as they are idle
+    (they are started again on demand) and new jobs are rejected until the
+    total is back under the budget. The budget must leave room for the
+    service process itself, which releasing drivers cannot shrink. The
+    `driver_memory_budget_mb` config key bounds the memory of each driver
+    (geckodriver and Firefox), a driver exceeding it is recycled.
+
+    Attributes:
+    - `config`: the configuration object (default: `Config('selescrape.json')`)
+    - `host`: the host to bind the HTTP API to (default: `127.0.0.1`)
+    - `port`: the port to bind the HTTP API to (default: `8700`)
+    - `workers`: the number of worker threads and drivers (default: `1`)
+    - `queue_size`: the maximum number of queued jobs (default: `16`)
+    - `history_size`: the maximum number of finished jobs to keep (default: `100`)
+    - `memory_budget`: the service and drivers memory budget in bytes (0 to disable)
+    - `driver_memory_budget`: the per driver memory budget in bytes (0 to disable)
+    - `peak_memory_usage`: the highest service process memory usage seen in bytes
+    - `jobs`: the submitted jobs by id
+    - `job_queue`: the bounded queue of jobs waiting for a worker
+
+    Methods:
+    - `start()`: start the workers and the HTTP API
+    - `serve_forever()`: start the service and block until interrupted
+    - `stop()`: stop the HTTP API, fail queued jobs and quit the drivers
+    - `submit_job(type, params)`: queue a job and return it
+    - `get_job(id)`: return the job with the given id
+    - `get_status()`: return the service status
+
+    HTTP API:
+    - `POST /jobs` with a JSON body `{"type": ..., "url": ..., ...}` and the
+      `Content-Type: application/json` header: submit
+      a job, respond `202` with the job or `503` when the queue is full, no
+      worker is running or the memory budget is exceeded
+    - `GET /jobs`: list the jobs
+    - `GET /jobs/<id>`: get the job with the given id
+    - `GET /status`: get the service status
+    """
+
+    # the scraper class used by each job type
+    JOB_SCRAPERS = {
+        "fetch": BaseScraper,
+        "scrape-article": MediumArticleScraper,
+        "scrape-trending": MediumTrendingLinksScraper,
+    }
+
+    def __init__(self, config: str | Config = "", host: str = "127.0.0.1", port: int = 8700, workers: int = 1, queue_size: int = 16, history_size: int = 100) -> None:
+        if isinstance(config, str):
+            self.config = Config(config or "selescrape.json")
+        else:
+            self.config = config
+        self.host = host
+        self.port = port
+        self.workers = workers
+        self.queue_size = queue_size
+        self.history_size = history_size
+        self.memory_budget = int(
+            self.config.data.get("memory_budget_mb") or 0) * 1024 * 1024
+        self.driver_memory_budget = int(
+            self.config.data.get("driver_memory_budget_mb") or 0) * 1024 * 1024
+        self.peak_memory_usage = 0
+        self.jobs: dict[str, ScraperJob] = {}
+        self.job_queue: queue.Queue[ScraperJob] = queue.Queue(queue_size)
+        self._jobs_lock = threading.Lock()
+        self._worker_threads: list[threading.Thread] = []
+        self._drivers: list[webdriver.Firefox | None] = [None] * workers
+        self._stop_event = threading.Event()
+        self._release_requested = [False] * workers
+        self._http_server = None
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__} host={self.host} port={self.port} workers={self.workers}>"
+
+    def start(self) -> None:
+        """ Start the workers and the HTTP API in background threads. """
+        print(f"Starting {self.workers} worker(s)")
+        self._stop_event.clear()
+        for i in range(self.workers):
+            t = threading.Thread(target=self._run_worker, args=(i,),
+                                 name=f"selescrape-worker-{i}", daemon=True)
+            t.start()
+            self._worker_threads.append(t)
+        self._http_server = ThreadingHTTPServer(
+            (self.host, self.port), ScraperServiceRequestHandler)
+        self._http_server.service = self
+        threading.Thread(target=self._http_server.serve_forever,
+                         name="selescrape-http", daemon=True).start()
+        print(f"Listening on http://{self.host}:{self.port}")
+
+    def serve_forever(self) -> None:
+        """ Start the service and block until `KeyboardInterrupt`. """
+        self.start()
+        try:
+            while any(t.is_alive() for t in self._worker_threads):
+                time.sleep(0.5)
+        finally:
+            self.stop()
+
+    def stop(self) -> None:
+        """
+        Stop the HTTP API, mark the queued jobs as failed, let the workers
+        finish their running jobs and quit the drivers.
+        """
+        print("Stopping service")
+        if self._http_server:
+            self._http_server.shutdown()
+            self._http_server.server_close()
+            self._http_server = None
+        self._stop_event.set()
+        while True:
+            try:
+                job = self.job_queue.get_nowait()
+            except queue.Empty:
+                break
+            self._fail_job(job, "service stopped")
+        for t in self._worker_threads:
+            t.join()
+        self._worker_threads = []
+        print("Done")
+
+    def submit_job(self, type: str, params: dict) -> ScraperJob:
+        """
+        Queue a job and return it. Raise `ValueError` if the job is invalid
+        and `queue.Full` if the job queue is full, no worker is running or the
+        memory budget is exceeded.
+        """
+        if type not in self.JOB_SCRAPERS:
+            raise ValueError(f"unknown job type: {type}")
+        if type != "scrape-trending" and not params.get("url"):
+            raise ValueError("url is empty")
+        for key in ("url", "wait_for_selector"):
+            if params.get(key) is not None and not isinstance(params[key], str):
+                raise ValueError(f"{key} must be a string")
+        try:
+            if int(params.get("wait_for_selector_timeout") or 0) < 0:
+                raise ValueError
+        except (TypeError, ValueError):
+            raise ValueError(
+                "wait_for_selector_timeout must be a non-negative integer") from None
+        file_name = params.get("file_name") or ""
+        if (not isinstance(file_name, str) or ".." in file_name
+                or "/" in file_name or "\\" in file_name
+                or os.path.basename(file_name) != file_name):
+            raise ValueError("file_name must be a file name without a path")
+        for key in ("root_selectors", "strip_tags"):
+            value = params.get(key)
+            if value is not None and (not isinstance(value, list) or not all(
+                    isinstance(item, str) for item in value)):
+                raise ValueError(f"{key} must be a list of strings")
+        if self._stop_event.is_set() or not any(t.is_alive() for t in self._worker_threads):
+            raise queue.Full("no worker is running")
+        # measuring the drivers scans /proc, so only do it with a budget set
+        if self.memory_budget:
+            total_memory_usage = self._get_total_memory_usage()
+            if self._is_over_memory_budget(total_memory_usage):
+                self._release_requested = [True] * self.workers
+                raise queue.Full(
+                    f"memory budget exceeded ({format_memory_usage(total_memory_usage)}), "
+                    "releasing drivers, retry later")
+
+        job = ScraperJob(type, params)
+        with self._jobs_lock:
+            self.job_queue.put_nowait(job)
+            self.jobs[job.id] = job
+            self._prune_jobs()
+        return job
+
+    def get_job(self, id: str) -> ScraperJob | None:
+        """ Return the job with the given id or `None` if it does not exist. """
+        with self._jobs_lock:
+            return self.jobs.get(id)
+
+    def get_jobs(self) -> list[ScraperJob]:
+        """ Return all the kept jobs, oldest first. """
+        with self._jobs_lock:
+            return list(self.jobs.values())
+
+    def get_status(self) -> dict:
+        """ Return the service status. """
+        with self._jobs_lock:
+            statuses = [job.status for job in self.jobs.values()]
+        return {
+            "workers": self.workers,
+            "workers_alive": sum(t.is_alive() for t in self._worker_threads),
+            "queue_size": self.queue_size,
+            "queued": self.job_queue.qsize(),
+            "running": statuses.count("running"),
+            "done": statuses.count("done"),
+            "failed": statuses.count("failed"),
+            "memory": {
+                "process": self._get_memory_usage(),
+                "process_peak": self.peak_memory_usage,
+                "total": self._get_total_memory_usage(),
+                "budget": self.memory_budget,
+                "drivers": [get_driver_memory_usage(driver) if driver else None
+                            for driver in self._drivers],
+                "driver_budget": self.driver_memory_budget,
+            },
+        }
+
+    def _get_total_memory_usage(self) -> int | None:
+        """ Return the memory usage of the service process and all drivers. """
+        usage = self._get_memory_usage()
+        if usage is None:
+            return None
+        for driver in list(self._drivers):
+            usage += (get_driver_memory_usage(driver) if driver else None) or 0
+        return usage
+
+    def _get_memory_usage(self) -> int | None:
+        """ Return the service process memory usage and update the peak. """
+        usage = get_memory_usage()
+        if usage:
+            self.peak_memory_usage = max(self.peak_memory_usage, usage)
+        return usage
+
+    def _prune_jobs(self) -> None:
+        """ Drop the oldest finished jobs exceeding `history_size`. """
+        finished = [id for id, job in self.jobs.items()
+                    if job.status in ("done", "failed")]
+        for id in finished[:max(0, len(finished) - self.history_size)]:
+            del self.jobs[id]
+
+    def _run_worker(self, index: int) -> None:
+        """
+        Run jobs from the job queue with a driver kept warm between jobs.
+        Recycle the driver when it exceeds the driver memory budget, and quit
+        it when the memory budget is exceeded or a release is requested.
+        """
+        print(f"Worker {index} is ready")
+        try:
+            while not self._stop_event.is_set():
+                try:
+                    job = self.job_queue.get(timeout=0.5)
+                except queue.Empty:
+                    job = None
+                if job is not None:
+                    self._run_job(job, index)
+                    if self._is_driver_over_budget(index):
+                        print(f"Worker {index} is recycling its driver")
+                        self._quit_driver(index)
+                    elif self.memory_budget and self._is_over_memory_budget(
+                            self._get_total_memory_usage()):
+                        self._release_requested[index] = True
+                if self._release_requested[index]:
+                    self._release_requested[index] = False
+                    if self._drivers[index] is not None:
+                        print(f"Worker {index} is releasing its driver")
+                        self._quit_driver(index)
+        finally:
+            self._quit_driver(index)
+
+    def _get_driver(self, index: int) -> webdriver.Firefox:
+        """ Return the driver of the given worker, starting it if needed. """
+        if self._drivers[index] is None:
+            self._drivers[index] = create_driver(self.config)
+        return self._drivers[index]
+
+    def _quit_driver(self, index: int) -> None:
+        """ Quit the driver of the given worker, if any, ignoring failures. """
+        driver, self._drivers[index] = self._drivers[index], None
+        if driver is None:
+            return
+        try:
+            driver.quit()
+        except Exception as e:
+            print(f"Worker {index} failed to quit its driver: {e}")
+
+    def _is_driver_over_budget(self, index: int) -> bool:
+        """
+        Report the memory usage of the service process and the driver of the
+        given worker, and return whether the driver exceeds its budget.
+        """
+        memory_usage = self._get_memory_usage()
+        driver = self._drivers[index]
+        driver_memory_usage = get_driver_memory_usage(driver) if driver else None
+        print(f"Worker {index} memory usage: "
+              f"service {format_memory_usage(memory_usage)} "
+              f"(peak {format_memory_usage(self.peak_memory_usage or None)}), "
+              f"driver {format_memory_usage(driver_memory_usage)}")
+        return bool(self.driver_memory_budget and driver_memory_usage
+                    and driver_memory_usage > self.driver_memory_budget)
+
+    def _is_over_memory_budget(self, total_memory_usage: int | None) -> bool:
+        """ Return whether the given total memory usage exceeds the memory budget. """
+        return bool(self.memory_budget and total_memory_usage
+                    and total_memory_usage > self.memory_budget)
+
+    def _run_job(self, job: ScraperJob, index: int) -> None:
+        """
+        Run the given job with the driver of the given worker and update its
+        status. Quit the driver when a WebDriver error left its session broken
+        so that it is replaced, page errors (e.g. timeouts) only fail the job.
+        """
+        job.status = "running"
+        job.started_at = time.time()
+        try:
+            driver = None
+            if self._job_needs_driver(job):
+                try:
+                    driver = self._get_driver(index)
+                except Exception as e:
+                    raise RuntimeError(
+                        f"driver could not be started: {e}") from e
+            if job.type == "fetch":
+                job.result = self._run_fetch_job(job, driver)
+            elif job.type == "scrape-article":
+                job.result = self._run_scrape_article_job(job, driver)
+            elif job.type == "scrape-trending":
+                job.result = self._run_scrape_trending_job(job, driver)
+            job.status = "done"
+        except Exception as e:
+            if isinstance(e, WebDriverException) and self._is_driver_broken(index, e):
+                print(f"Worker {index} is replacing its driver after an error")
+                self._quit_driver(index)
+            self._fail_job(job, f"{e.__class__.__name__}: {e}")
+            return
+        job.finished_at = time.time()
+        with self._jobs_lock:
+            self._prune_jobs()
+
+    def _is_driver_broken(self, index: int, error: WebDriverException) -> bool:
+        """
+        Return whether the given error left the session of the driver of the
+        given worker broken, checking that the driver still responds.
+        """
+        driver = self._drivers[index]
+        if driver is None:
+            return False
+        if isinstance(error, (InvalidSessionIdException, NoSuchWindowException)):
+            return True
+        try:
+            driver.current_url
+        except WebDriverException:
+            return True
+        return False
+
+    def _job_needs_driver(self, job: ScraperJob) -> bool:
+        """
+        Return whether the given job fetches html with Selenium, see
+        `BaseScraper.requires_driver`.
+        """
+        return (self.JOB_SCRAPERS[job.type].requires_driver
+                or bool(self.config.data["driver_path"]))
+
+    def _fail_job(self, job: ScraperJob, error: str) -> None:
+        """ Mark the given job as failed with the given error. """
+        job.error = error
+        job.status = "failed"
+        job.finished_at = time.time()
+        with self._jobs_lock:
+            self._prune_jobs()
+
+    def _get_output_file_name(self, job: ScraperJob, url: str) -> str:
+        """
+        Return the output file name of the given job, suffixed with the job id
+        so that jobs never write to the same file.
+        """
+        file_name = job.params.get("file_name") or construct_file_name_from_url(url)
+        return f"{file_name.removesuffix('.html')}_{job.id}"
+
+    def _run_fetch_job(self, job: ScraperJob, driver: webdriver.Firefox | None) -> dict:
+        """ Fetch and save the html of the `url` param. """
+        params = job.params
+        with BaseScraper(
+                params["url"], self._get_output_file_name(job, params["url"]),
+                self.config, params.get("wait_for_selector"),
+                int(params.get("wait_for_selector_timeout") or 0), driver,
+                params.get("root_selectors"), params.get("strip_tags"),
+                release_after_save=True) as scraper:
+            scraper.fetch_html()
+            scraper.save_html(overwrite=False)
+            return {"output_file_path": scraper.output_file_path}
+
+    def _run_scrape_article_job(self, job: ScraperJob, driver: webdriver.Firefox) -> dict:
+        """ Fetch, scrape and save the Medium article of the `url` param. """
+        params = job.params
+        with MediumArticleScraper(
+                params["url"], self._get_output_file_name(job, params["url"]),
+                self.config, driver, release_after_save=True) as scraper:
+            scraper.fetch_html()
+            scraper.scrape_article_content()
+            scraper.save_html(overwrite=False)
+            return {"output_file_path": scraper.output_file_path}
+
+    def _run_scrape_trending_job(self, job: ScraperJob, driver: webdriver.Firefox | None) -> dict:
+        """ Fetch, scrape and save the Medium trending article links. """
+        url = job.params.get("url") or "https://www.medium.com"
+        with MediumTrendingLinksScraper(
+                url, self._get_output_file_name(job, url), self.config, driver,
+                release_after_save=True) as scraper:
+            scraper.fetch_html()
+            scraper.scrape_trending_links()
+            scraper.save_trending_links()
+            return {"trending_links": scraper.trending_links}
+
+
+class ScraperServiceRequestHandler(BaseHTTPRequestHandler):
+    """ The HTTP request handler of the `ScraperService` job API. """
+
+    def do_GET(self) -> None:
+        service = self.server.service
+        path = self.path.rstrip("/")
+        if path == "/status":
+            self._send_json(200, service.get_status())
+        elif path == "/jobs":
+            self._send_json(200, [job.to_dict() for job in service.get_jobs()])
+        elif path.startswith("/jobs/"):
+            job = service.get_job(path.removeprefix("/jobs/"))
+            if job is None:
+                self._send_json(404, {"error": "job not found"})
+            else:
+                self._send_json(200, job.to_dict())
+        else:
+            self._send_json(404, {"error": "not found"})
+
+    def do_POST(self) -> None:
+        service = self.server.service
+        if self.path.rstrip("/") != "/jobs":
+            self._send_json(404, {"error": "not found"})
+            return
+        # a JSON content type cannot be sent cross-origin without a preflight
+        if self.headers.get_content_type() != "application/json":
+            self._send_json(
+                415, {"error": "Content-Type must be application/json"})
+            return
+        try:
+            length = int(self.headers.get("Content-Length") or 0)
+            params = json.loads(self.rfile.read(length) or b"{}")
+            if not isinstance(params, dict):
+                raise ValueError("request body must be a JSON object")
+            job = service.submit_job(params.pop("type", ""), params)
+        except (ValueError, json.JSONDecodeError) as e:
+            self._send_json(400, {"error": str(e)})
+        except queue.Full as e:
+            self._send_json(503, {"error": str(e) or "job queue is full"})
+        else:
+            self._send_json(202, job.to_dict())
+
+    def log_message(self, format: str, *args) -> None:
+        if self.server.service.config.data["verbose_mode"]:
+            super().log_message(format, *args)
+
+    def _send_json(self, status: int, data: dict | list) -> None:
+        body = json.dumps(data).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
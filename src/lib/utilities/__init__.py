@@ -1,2 +1,4 @@
 from lib.utilities.config import Config
 from lib.utilities.construct_file_name_from_url import construct_file_name_from_url
+from lib.utilities.memory import format_memory_usage, get_memory_usage, get_process_tree_memory_usage
+from lib.utilities.driver import create_driver, get_driver_memory_usage, open_driver
@@ -64,6 +64,9 @@ class Config:
         data = {
             "app": "selescrape",
             "version": "1.0",
+            # memory budgets in MB used by the scraper service (0 to disable)
+            "memory_budget_mb": 0,
+            "driver_memory_budget_mb": 0,
         }
 
         # user input
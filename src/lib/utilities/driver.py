@@ -0,0 +1,53 @@
+from __future__ import annotations
+import os
+from contextlib import contextmanager
+from typing import Iterator
+from selenium import webdriver
+from lib.utilities.config import Config
+from lib.utilities.memory import get_process_tree_memory_usage
+
+
+def create_driver(config: Config) -> webdriver.Firefox:
+    """
+    Create a Selenium Firefox driver using the `driver_path` config key. Fall
+    back to the geckodriver found in PATH when `driver_path` is not set.
+    """
+    option = webdriver.FirefoxOptions()
+    # I use the following options as my machine is a window subsystem linux.
+    # I recommend to use the headless option at least, out of the 3
+    option.add_argument('--headless')
+    option.add_argument('--no-sandbox')
+    option.add_argument('--disable-dev-sh-usage')
+    driver_path = config.data["driver_path"]
+    if not driver_path:
+        return webdriver.Firefox(options=option)
+    # replace \\ with / in path if in windows
+    if os.name == "nt":
+        driver_path = driver_path.replace("\\", "/")
+    return webdriver.Firefox(executable_path=driver_path, options=option)
+
+
+@contextmanager
+def open_driver(config: Config) -> Iterator[webdriver.Firefox]:
+    """
+    Create a Selenium Firefox driver with `create_driver` and quit it when
+    the `with` block exits, e.g.:
+
+    `with open_driver(config) as driver: ...`
+    """
+    driver = create_driver(config)
+    try:
+        yield driver
+    finally:
+        driver.quit()
+
+
+def get_driver_memory_usage(driver: webdriver.Firefox) -> int | None:
+    """
+    Return the resident memory (RSS) in bytes of the given driver, including
+    geckodriver and the browser processes. Return `None` if it is not available.
+    """
+    process = getattr(getattr(driver, "service", None), "process", None)
+    if process is None:
+        return None
+    return get_process_tree_memory_usage(process.pid)
@@ -0,0 +1,58 @@
+from __future__ import annotations
+import os
+
+
+def get_memory_usage(pid: int | None = None) -> int | None:
+    """
+    Return the resident memory (RSS) in bytes of the process with the given
+    `pid` (default: the current process). Return `None` if it is not available
+    (the process does not exist or `/proc` is not supported, e.g. in windows).
+    """
+    try:
+        with open(f"/proc/{pid or os.getpid()}/status", "r") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except (OSError, ValueError):
+        pass
+    return None
+
+
+def get_process_tree_memory_usage(pid: int) -> int | None:
+    """
+    Return the resident memory (RSS) in bytes of the process with the given
+    `pid` and all of its descendants, e.g. geckodriver and its Firefox
+    processes. Return `None` if it is not available.
+    """
+    # map each process to its children using the parent pid in /proc/<pid>/stat
+    children: dict[int, list[int]] = {}
+    try:
+        for entry in os.listdir("/proc"):
+            if not entry.isdigit():
+                continue
+            try:
+                with open(f"/proc/{entry}/stat", "r") as f:
+                    # the command name may contain spaces, the ppid follows it
+                    ppid = int(f.read().rsplit(")", 1)[1].split()[1])
+            except (OSError, ValueError, IndexError):
+                continue
+            children.setdefault(ppid, []).append(int(entry))
+    except OSError:
+        return None
+
+    total = None
+    pids = [pid]
+    while pids:
+        current = pids.pop()
+        usage = get_memory_usage(current)
+        if usage is not None:
+            total = (total or 0) + usage
+        pids.extend(children.get(current, []))
+    return total
+
+
+def format_memory_usage(usage: int | None) -> str:
+    """ Format the given memory usage in bytes to a human readable string. """
+    if usage is None:
+        return "unavailable"
+    return f"{usage / 1024 / 1024:.1f} MB"
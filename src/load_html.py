@@ -23,14 +23,14 @@ def main(args=None):
             "Enter config name (default: selescrape.json): ")
         wait_for = None
         wait_timeout = 0
-        scraper = BaseScraper(url, output_file_name, config,
-                              wait_for, wait_timeout)
-        # run scraper
-        scraper.load_html(os.path.abspath(input_file_path))
-        if input("Print html? (y/n): ") == "y":
-            print(scraper.html)
-        if input("Save html? (y/n): ") == "y":
-            scraper.save_html()
+        with BaseScraper(url, output_file_name, config,
+                         wait_for, wait_timeout) as scraper:
+            # run scraper
+            scraper.load_html(os.path.abspath(input_file_path))
+            if input("Print html? (y/n): ") == "y":
+                print(scraper.html)
+            if input("Save html? (y/n): ") == "y":
+                scraper.save_html()
     except KeyboardInterrupt:
         print("\nExiting...")
 
@@ -21,11 +21,11 @@ def main(args=None):
             "Enter file name (default is auto-generated): ")
         config = args[2] if len(args) >= 3 else input(
             "Enter config name (default: selescrape.json): ")
-        scraper = MediumArticleScraper(url, file_name, config)
-        # run scraper
-        scraper.fetch_html()
-        scraper.scrape_article_content()
-        scraper.save_html()
+        with MediumArticleScraper(url, file_name, config) as scraper:
+            # run scraper
+            scraper.fetch_html()
+            scraper.scrape_article_content()
+            scraper.save_html()
     except KeyboardInterrupt:
         print("\nExiting...")
 
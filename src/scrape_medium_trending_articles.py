@@ -1,6 +1,11 @@
+import queue
 import sys
 import threading
 from lib import MediumTrendingLinksScraper, MediumArticleScraper
+from lib.utilities import format_memory_usage, get_driver_memory_usage, get_memory_usage, open_driver
+
+# the number of times a worker tries to start a driver before giving up
+DRIVER_START_ATTEMPTS = 3
 
 
 def main(args=None):
@@ -8,10 +13,12 @@ def main(args=None):
     Main function.
 
     Command line syntax:
-    `python scrape_medium_trending_articles.py [file_name] [config]`
+    `python scrape_medium_trending_articles.py [file_name] [config] [browsers]`
 
     - `<>` are required arguments
     - `[]` are optional arguments
+    - `browsers` is the number of browsers fetching the articles concurrently,
+      each recycled when it exceeds the `driver_memory_budget_mb` config key
     """
     try:
         # initialize scraper
@@ -20,11 +27,15 @@ def main(args=None):
             "Enter file name (default is auto-generated): ")
         config = args[2] if len(args) >= 3 else input(
             "Enter config name (default: selescrape.json): ")
-        scraper = MediumTrendingLinksScraper(url, file_name, config)
-        # run scraper
-        scraper.fetch_html()
-        scraper.scrape_trending_links()
-        scraper.save_trending_links()
+        browsers = args[3] if len(args) >= 4 else input(
+            "Enter number of browsers to fetch articles with (default: 2): ")
+        with MediumTrendingLinksScraper(url, file_name, config,
+                                        release_after_save=True) as scraper:
+            # run scraper
+            scraper.fetch_html()
+            scraper.scrape_trending_links()
+            scraper.save_trending_links()
+            print_memory_usage(scraper.driver)
 
         # print out trending links
         print("\n==============================")
@@ -41,24 +52,97 @@ def main(args=None):
             if answer != "y":
                 print("Please enter 'y' or 'n'.")
                 continue
-            threads = []
+            links = queue.Queue()
             for link in scraper.trending_links:
+                links.put(link)
+            threads = []
+            for _ in range(max(1, int(browsers or 2))):
                 t = threading.Thread(
-                    target=fetch_trending_article, args=(link, scraper.config))
+                    target=fetch_trending_articles, args=(links, scraper.config))
                 t.start()
                 threads.append(t)
             for t in threads:
                 t.join()
+            # links are left only when every worker failed to start a driver
+            if not links.empty():
+                skipped = [links.get_nowait() for _ in range(links.qsize())]
+                print(f"\nError: could not start a driver, skipped "
+                      f"{len(skipped)} article(s):")
+                for link in skipped:
+                    print(link)
+                sys.exit(1)
+            print_memory_usage()
             break
     except KeyboardInterrupt:
         print("\nExiting...")
 
 
-def fetch_trending_article(url, config):
-    article = MediumArticleScraper(url, config=config) # omit file_name
-    article.fetch_html()
-    article.scrape_article_content()
-    article.save_html()
+def fetch_trending_articles(links, config):
+    """
+    Fetch the trending articles from the `links` queue with one driver, and
+    recycle the driver when it exceeds the `driver_memory_budget_mb` config
+    key or fails. Give up, leaving the links to the other workers, when the
+    driver fails to start `DRIVER_START_ATTEMPTS` times in a row.
+    """
+    failed_starts = 0
+    while not links.empty():
+        try:
+            with open_driver(config) as driver:
+                failed_starts = 0
+                fetch_trending_articles_with_driver(links, config, driver)
+        except Exception as e:
+            failed_starts += 1
+            print(f"Failed to start driver ({failed_starts}/"
+                  f"{DRIVER_START_ATTEMPTS}): {e}")
+            if failed_starts >= DRIVER_START_ATTEMPTS:
+                return
+
+
+def fetch_trending_articles_with_driver(links, config, driver):
+    """
+    Fetch the trending articles from the `links` queue with the given driver
+    until the queue is empty or the driver needs to be recycled.
+    """
+    driver_memory_budget = int(
+        config.data.get("driver_memory_budget_mb") or 0) * 1024 * 1024
+    while True:
+        try:
+            url = links.get_nowait()
+        except queue.Empty:
+            return
+        driver_memory_usage = fetch_trending_article(url, config, driver)
+        if driver_memory_usage is False or (
+                driver_memory_budget and driver_memory_usage
+                and driver_memory_usage > driver_memory_budget):
+            print("Recycling driver")
+            return
+
+
+def fetch_trending_article(url, config, driver):
+    """
+    Fetch, scrape and save the article with the given driver, and return the
+    driver memory usage, or `False` if the article failed.
+    """
+    try:
+        # omit file_name
+        with MediumArticleScraper(url, config=config, driver=driver,
+                                  release_after_save=True) as article:
+            article.fetch_html()
+            article.scrape_article_content()
+            article.save_html()
+            return print_memory_usage(article.driver, url)
+    except Exception as e:
+        print(f"Failed to fetch {url}: {e}")
+        return False
+
+
+def print_memory_usage(driver=None, url=None):
+    """ Print the memory usage of the process and the driver and return the latter. """
+    driver_memory_usage = get_driver_memory_usage(driver) if driver else None
+    print(f"Memory usage{f' after {url}' if url else ''}: "
+          f"process {format_memory_usage(get_memory_usage())}, "
+          f"driver {format_memory_usage(driver_memory_usage)}")
+    return driver_memory_usage
 
 
 if __name__ == '__main__':
@@ -19,11 +19,12 @@ def main(args=None):
             "Enter file name (default is auto-generated): ")
         config = args[2] if len(args) >= 3 else input(
             "Enter config name (default: selescrape.json): ")
-        scraper = MediumTrendingLinksScraper(url, file_name, config)
-        # run scraper
-        scraper.fetch_html()
-        scraper.scrape_trending_links()
-        scraper.save_trending_links()
+        with MediumTrendingLinksScraper(url, file_name, config,
+                                        release_after_save=True) as scraper:
+            # run scraper
+            scraper.fetch_html()
+            scraper.scrape_trending_links()
+            scraper.save_trending_links()
 
         # print out trending links
         print("\n==============================")
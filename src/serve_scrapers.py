@@ -0,0 +1,37 @@
+import sys
+from lib import ScraperService
+
+
+def main(args=None):
+    """
+    Main function.
+
+    Command line syntax:
+    `python serve_scrapers.py [port] [workers] [queue_size] [config]`
+
+    - `<>` are required arguments
+    - `[]` are optional arguments
+
+    Submit jobs to the running service, e.g.:
+    `curl -H "Content-Type: application/json" -d '{"type": "scrape-article", "url": "<url>"}' localhost:8700/jobs`
+    """
+    try:
+        port = args[0] if len(args) >= 1 else input(
+            "Enter port (default: 8700): ")
+        workers = args[1] if len(args) >= 2 else input(
+            "Enter number of workers (default: 1): ")
+        queue_size = args[2] if len(args) >= 3 else input(
+            "Enter job queue size (default: 16): ")
+        config = args[3] if len(args) >= 4 else input(
+            "Enter config name (default: selescrape.json): ")
+        service = ScraperService(config, port=int(port or 8700),
+                                 workers=int(workers or 1),
+                                 queue_size=int(queue_size or 16))
+        # run service
+        service.serve_forever()
+    except KeyboardInterrupt:
+        print("\nExiting...")
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])